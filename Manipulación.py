@@ -1,4 +1,20 @@
 import os
+import csv
+import sys
+import mmap
+import locale
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+# A partir de este tamaño el archivo se mapea en memoria en vez de leerse completo
+UMBRAL_MMAP = 10 * 1024 * 1024
+
+# Separa los nombres en el texto de búsqueda; no aparece en nombres escritos por teclado
+SEPARADOR = '\x1f'
+
+# csv limita cada campo a 128 KiB; se amplía para leer nombres largos igual que con split('|')
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
 
 class Producto:
     """
@@ -11,16 +27,21 @@ class Producto:
         precio (float): Precio unitario
     """
     
+    __slots__ = ('id', 'nombre', 'cantidad', 'precio', '_str')  # Sin __dict__ por instancia
+    
     def __init__(self, id_producto, nombre, cantidad, precio):
         """Inicializa un nuevo producto"""
         self.id = id_producto
         self.nombre = nombre
         self.cantidad = cantidad
         self.precio = precio
+        self._str = None  # Representación en cadena ya formateada (None = por calcular)
     
     def __str__(self):
-        """Representación en cadena del producto"""
-        return f"ID: {self.id} | Nombre: {self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"
+        """Representación en cadena del producto (se formatea una vez y se reutiliza)"""
+        if self._str is None:
+            self._str = f"ID: {self.id} | Nombre: {self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"
+        return self._str
 
 
 class Inventario:
@@ -30,47 +51,235 @@ class Inventario:
     Atributos:
         productos (dict): Diccionario de productos (clave: id_producto)
         archivo (str): Ruta del archivo donde se almacenan los productos
+        archivo_log (str): Diario donde se anexa cada cambio (archivo + '.log')
+        _nombres_norm (dict): Nombres normalizados con casefold() por id
+        cache_size (int): Cantidad de búsquedas por nombre recordadas (0 desactiva la caché)
+        durable (bool): Si es True, cada escritura se fuerza al disco con os.fsync
+    
+    Cada cambio se anexa como una línea al diario en lugar de reescribir el
+    archivo completo; al cargar se aplica el diario sobre el archivo, y este
+    se compacta cuando el diario crece más del doble que el inventario.
+    
+    Puede usarse como gestor de contexto para agrupar varios cambios y
+    escribir el diario una sola vez al salir del bloque.
     """
     
-    def __init__(self, archivo='inventario.txt'):
+    def __init__(self, archivo='inventario.txt', cache_size=128, durable=False):
         """Inicializa un inventario vacío y carga productos desde un archivo"""
         self.productos = {}
+        self._nombres_norm = {}
+        self._blob = None  # Nombres normalizados unidos en un solo texto (None = por construir)
+        self._blob_inicios = []
+        self._blob_ids = []
         self.archivo = archivo
+        self.cache_size = cache_size
+        self.durable = durable
+        self._buscar_cacheado = lru_cache(maxsize=cache_size)(self._buscar_por_nombre)
+        self._listado = None  # Texto del listado completo, reutilizado mientras no haya cambios
+        self.archivo_log = archivo + '.log'
+        self._operaciones_log = 0  # Líneas escritas en el diario desde la última compactación
+        self._nivel_lote = 0  # Bloques 'with' abiertos; mientras sea > 0 no se guarda
+        self._pendientes = []  # Líneas del diario aún no escritas
         self.cargar_inventario()
     
+    def __len__(self):
+        """Cantidad de productos en el inventario"""
+        return len(self.productos)
+    
+    def __enter__(self):
+        """Inicia un lote de cambios: el guardado se difiere hasta salir del bloque"""
+        self._nivel_lote += 1
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Cierra el lote y guarda una sola vez los cambios acumulados"""
+        self._nivel_lote -= 1
+        if self._nivel_lote == 0:
+            self.guardar_pendientes()
+        return False
+    
     def cargar_inventario(self):
-        """Carga los productos desde el archivo"""
+        """Carga los productos desde el archivo y aplica los cambios del diario"""
         if os.path.exists(self.archivo):
             try:
-                with open(self.archivo, 'r') as file:
-                    for linea in file:
-                        id_producto, nombre, cantidad, precio = linea.strip().split('|')
-                        self.productos[id_producto] = Producto(id_producto, nombre, int(cantidad), float(precio))
+                if os.path.getsize(self.archivo) > UMBRAL_MMAP:
+                    # Archivos grandes: se recorren las páginas mapeadas sin copiar todo a un str
+                    codificacion = locale.getpreferredencoding(False)
+                    with open(self.archivo, 'rb') as file, \
+                            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        self.productos = self._productos_desde_lineas(
+                            linea.decode(codificacion) for linea in iter(mm.readline, b''))
+                else:
+                    with open(self.archivo, 'r', newline='', buffering=1 << 20) as file:
+                        self.productos = self._productos_desde_lineas(file)
             except (FileNotFoundError, PermissionError) as e:
                 print(f"Error al cargar el inventario: {e}")
+        escritura_cortada = False
+        if os.path.exists(self.archivo_log):
+            try:
+                with open(self.archivo_log, 'r', newline='') as file:
+                    lineas = file.readlines()
+                self._operaciones_log = len(lineas)
+                # Una última línea sin '\n' es una escritura interrumpida: no se aplica
+                if lineas and not lineas[-1].endswith('\n'):
+                    escritura_cortada = True
+                    lineas.pop()
+                for campos in csv.reader(lineas, delimiter='|', quoting=csv.QUOTE_NONE):
+                    try:
+                        if campos:
+                            self._aplicar_operacion(campos)
+                    except ValueError:
+                        pass  # Línea dañada: se descarta sin detener la carga
+            except (FileNotFoundError, PermissionError) as e:
+                print(f"Error al cargar el diario del inventario: {e}")
+        self._nombres_norm = {id_producto: p.nombre.casefold() for id_producto, p in self.productos.items()}
+        self._invalidar_caches()
+        if escritura_cortada:
+            # Se compacta para que el próximo cambio no se pegue a la línea cortada
+            self.guardar_inventario()
+    
+    @staticmethod
+    def _productos_desde_lineas(lineas):
+        """Construye el diccionario de productos a partir de líneas 'id|nombre|cantidad|precio'"""
+        # csv.reader separa los campos en C; QUOTE_NONE porque el formato no usa comillas
+        filas = csv.reader(lineas, delimiter='|', quoting=csv.QUOTE_NONE)
+        productos = map(Inventario._producto_desde_fila, filas)
+        return {p.id: p for p in productos if p is not None}
+    
+    @staticmethod
+    def _producto_desde_fila(fila):
+        """Crea el producto de una fila del archivo, o retorna None si la fila no es válida"""
+        if len(fila) != 4:
+            return None
+        try:
+            return Producto(fila[0], fila[1], int(fila[2]), float(fila[3]))
+        except ValueError:
+            return None
+    
+    def _aplicar_operacion(self, campos):
+        """Aplica al diccionario una operación leída del diario"""
+        operacion = campos[0]
+        if operacion == 'A' and len(campos) == 5:
+            id_producto, nombre, cantidad, precio = campos[1:]
+            self.productos[id_producto] = Producto(id_producto, nombre, int(cantidad), float(precio))
+        elif operacion == 'U' and len(campos) == 4 and campos[1] in self.productos:
+            producto = self.productos[campos[1]]
+            producto.cantidad = int(campos[2])
+            producto.precio = float(campos[3])
+            producto._str = None
+        elif operacion == 'D' and len(campos) == 2:
+            self.productos.pop(campos[1], None)
+        # Una línea con otra forma se ignora; si un valor no se puede convertir se lanza
+        # ValueError y cargar_inventario la descarta
+    
+    def _invalidar_caches(self):
+        """Descarta las búsquedas y el listado guardados tras un cambio en los productos"""
+        self._buscar_cacheado.cache_clear()
+        self._listado = None
+        self._blob = None
     
     def guardar_inventario(self):
-        """Guarda los productos en el archivo"""
+        """Guarda todos los productos en el archivo y vacía el diario (compactación)"""
+        temp_file = self.archivo + '.tmp'
         try:
-            with open(self.archivo, 'w') as file:
+            # Se escribe en un temporal para que una caída no deje el archivo a medias
+            with open(temp_file, 'w') as file:
                 for producto in self.productos.values():
                     file.write(f"{producto.id}|{producto.nombre}|{producto.cantidad}|{producto.precio}\n")
+                if self.durable:
+                    # El archivo debe estar en disco antes de vaciar el diario
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(temp_file, self.archivo)
+            # El archivo ya refleja todos los cambios: el diario se puede vaciar
+            open(self.archivo_log, 'w').close()
+            self._operaciones_log = 0
+        except (PermissionError, IOError) as e:
+            print(f"Error al guardar el inventario: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    
+    def guardar_pendientes(self):
+        """Anexa al diario los cambios sin escribir y compacta si el diario creció demasiado"""
+        if not self._pendientes:
+            return
+        lineas, self._pendientes = self._pendientes, []
+        try:
+            with open(self.archivo_log, 'a') as file:
+                file.write(''.join(lineas))
+                if self.durable:
+                    file.flush()
+                    os.fsync(file.fileno())
+            self._operaciones_log += len(lineas)
         except (PermissionError, IOError) as e:
             print(f"Error al guardar el inventario: {e}")
+            return
+        if self._operaciones_log > 2 * len(self.productos):
+            self.guardar_inventario()
+    
+    def _registrar(self, linea):
+        """Registra un cambio en el diario, o lo deja pendiente si hay un lote abierto"""
+        self._pendientes.append(linea + '\n')
+        if self._nivel_lote == 0:
+            self.guardar_pendientes()
     
     def agregar_producto(self, producto):
-        """Agrega un nuevo producto al inventario"""
+        """Agrega un nuevo producto al inventario
+        
+        Retorna False si el ID ya existe o si el ID o el nombre contienen '|',
+        que es el separador de campos del archivo.
+        """
         if producto.id in self.productos:
             return False
+        if '|' in producto.id or '|' in producto.nombre:
+            return False
         self.productos[producto.id] = producto
-        self.guardar_inventario()  # Guardar cambios en el archivo
+        self._nombres_norm[producto.id] = producto.nombre.casefold()
+        self._invalidar_caches()
+        # Guardar cambios en el archivo
+        self._registrar(f"A|{producto.id}|{producto.nombre}|{producto.cantidad}|{producto.precio}")
         return True
     
+    def agregar_productos(self, productos):
+        """Agrega varios productos escribiendo el archivo una sola vez
+        
+        Retorna la cantidad de productos agregados (se omiten IDs repetidos).
+        """
+        with self:
+            return sum(1 for producto in productos if self.agregar_producto(producto))
+    
+    def cargar_desde_csv(self, ruta):
+        """Importa productos desde un archivo con líneas 'id|nombre|cantidad|precio'
+        
+        Todos los productos se agregan en un solo lote, con una única escritura.
+        Retorna una tupla (agregados, lineas_invalidas); las líneas vacías se ignoran.
+        """
+        productos = []
+        invalidas = 0
+        with open(ruta, 'r', newline='') as file:
+            for fila in csv.reader(file, delimiter='|', quoting=csv.QUOTE_NONE):
+                if not any(campo.strip() for campo in fila):
+                    continue
+                try:
+                    id_producto, nombre, cantidad, precio = fila
+                    producto = Producto(id_producto.strip(), nombre.strip(), int(cantidad), float(precio))
+                except ValueError:
+                    invalidas += 1
+                    continue
+                # 'not (... >= 0)' rechaza también nan, igual que la validación interactiva
+                if not producto.id or producto.cantidad < 0 or not (producto.precio >= 0):
+                    invalidas += 1
+                    continue
+                productos.append(producto)
+        return self.agregar_productos(productos), invalidas
+    
     def eliminar_producto(self, id_producto):
         """Elimina un producto del inventario"""
         if id_producto in self.productos:
             del self.productos[id_producto]
-            self.guardar_inventario()  # Guardar cambios en el archivo
+            del self._nombres_norm[id_producto]
+            self._invalidar_caches()
+            self._registrar(f"D|{id_producto}")  # Guardar cambios en el archivo
             return True
         return False
     
@@ -81,12 +290,21 @@ class Inventario:
         
         producto = self.productos[id_producto]
         
-        if cantidad is not None:
+        # Si los valores no cambian no hay nada que escribir
+        cambia_cantidad = cantidad is not None and cantidad != producto.cantidad
+        cambia_precio = precio is not None and precio != producto.precio
+        if not (cambia_cantidad or cambia_precio):
+            return True
+        
+        if cambia_cantidad:
             producto.cantidad = cantidad
-        if precio is not None:
+        if cambia_precio:
             producto.precio = precio
+        producto._str = None
+        self._listado = None
             
-        self.guardar_inventario()  # Guardar cambios en el archivo
+        # Guardar cambios en el archivo
+        self._registrar(f"U|{producto.id}|{producto.cantidad}|{producto.precio}")
         return True
     
     def buscar_por_id(self, id_producto):
@@ -95,12 +313,53 @@ class Inventario:
     
     def buscar_por_nombre(self, nombre_buscado):
         """Busca productos por nombre (búsqueda parcial)"""
-        nombre_buscado = nombre_buscado.lower()
-        return [p for p in self.productos.values() if nombre_buscado in p.nombre.lower()]
+        return list(self._buscar_cacheado(nombre_buscado.casefold()))
+    
+    def _buscar_por_nombre(self, nombre_buscado):
+        """Búsqueda sin caché sobre el texto con todos los nombres
+        
+        Retorna una tupla para que el resultado cacheado no se modifique.
+        """
+        if not nombre_buscado:
+            return tuple(self.productos.values())
+        if SEPARADOR in nombre_buscado:
+            return ()
+        if self._blob is None:
+            self._construir_blob()
+        # str.find recorre el texto en C; cada coincidencia se ubica en su nombre con bisect
+        resultados = []
+        pos = self._blob.find(nombre_buscado)
+        while pos != -1:
+            i = bisect_right(self._blob_inicios, pos) - 1
+            resultados.append(self.productos[self._blob_ids[i]])
+            pos = self._blob.find(nombre_buscado, self._blob_inicios[i + 1])  # Siguiente nombre
+        return tuple(resultados)
+    
+    def _construir_blob(self):
+        """Une los nombres normalizados en un solo texto separado por SEPARADOR"""
+        nombres = self._nombres_norm.values()
+        self._blob_ids = list(self._nombres_norm)
+        self._blob = SEPARADOR.join(nombres) + SEPARADOR
+        # Posición donde empieza cada nombre; la última entrada es el largo total del texto
+        self._blob_inicios = list(accumulate((len(nombre) + 1 for nombre in nombres), initial=0))
     
     def obtener_todos(self):
-        """Obtiene todos los productos del inventario"""
-        return list(self.productos.values())
+        """Obtiene todos los productos del inventario
+        
+        Retorna una vista sin copiar, que refleja los cambios posteriores;
+        usar list() sobre el resultado si se necesita una copia fija.
+        """
+        return self.productos.values()
+    
+    def listado(self):
+        """Obtiene el texto con todos los productos, una línea por producto"""
+        if self._listado is None:
+            self._listado = '\n'.join(str(p) for p in self.productos.values())
+        return self._listado
+    
+    def valor_total(self):
+        """Calcula el valor del inventario (suma de cantidad * precio)"""
+        return sum(p.cantidad * p.precio for p in self.productos.values())
 
 
 def mostrar_menu():
@@ -113,6 +372,7 @@ def mostrar_menu():
     print("5. Buscar por nombre")
     print("6. Mostrar todos los productos")
     print("7. Salir")
+    print("8. Importar productos desde archivo")
 
 
 def solicitar_datos_producto():
@@ -122,11 +382,19 @@ def solicitar_datos_producto():
     # Validar ID
     while True:
         id_producto = input("ID del producto: ").strip()
-        if id_producto:
+        if not id_producto:
+            print("Error: El ID no puede estar vacío")
+        elif '|' in id_producto:
+            print("Error: El ID no puede contener el carácter '|'")
+        else:
             break
-        print("Error: El ID no puede estar vacío")
     
-    nombre = input("Nombre del producto: ").strip()
+    # Validar nombre ('|' separa los campos en el archivo)
+    while True:
+        nombre = input("Nombre del producto: ").strip()
+        if '|' not in nombre:
+            break
+        print("Error: El nombre no puede contener el carácter '|'")
     
     # Validar cantidad
     while True:
@@ -157,7 +425,7 @@ def main():
     
     while True:
         mostrar_menu()
-        opcion = input("\nSeleccione una opción (1-7): ")
+        opcion = input("\nSeleccione una opción (1-8): ")
         
         if opcion == '1':
             producto = solicitar_datos_producto()
@@ -213,19 +481,21 @@ def main():
             
             if resultados:
                 print(f"\nSe encontraron {len(resultados)} productos:")
-                for producto in resultados:
-                    print(producto)
+                sys.stdout.write('\n'.join(map(str, resultados)))
+                sys.stdout.write('\n')
             else:
                 print("\n✗ No se encontraron productos con ese nombre")
         
         elif opcion == '6':
-            productos = inventario.obtener_todos()
+            total = len(inventario)
             
-            if productos:
+            if total:
                 print("\n--- LISTADO DE PRODUCTOS ---")
-                for producto in productos:
-                    print(producto)
-                print(f"\nTotal: {len(productos)} productos")
+                # Una sola escritura para todo el listado en lugar de un print por producto
+                sys.stdout.write(inventario.listado())
+                sys.stdout.write('\n')
+                print(f"\nTotal: {total} productos")
+                print(f"Valor del inventario: ${inventario.valor_total():.2f}")
             else:
                 print("\nEl inventario está vacío")
         
@@ -233,8 +503,18 @@ def main():
             print("\nSaliendo del sistema...")
             break
         
+        elif opcion == '8':
+            ruta = input("\nIngrese la ruta del archivo a importar (id|nombre|cantidad|precio): ").strip()
+            try:
+                agregados, invalidas = inventario.cargar_desde_csv(ruta)
+                print(f"\n✓ Se importaron {agregados} productos")
+                if invalidas:
+                    print(f"⚠️ Se omitieron {invalidas} líneas con formato inválido")
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                print(f"\n✗ Error al leer el archivo: {e}")
+        
         else:
-            print("\n✗ Opción no válida. Por favor seleccione una opción del 1 al 7.")
+            print("\n✗ Opción no válida. Por favor seleccione una opción del 1 al 8.")
         
         input("\nPresione Enter para continuar...")
 
@@ -1,17 +1,37 @@
 import os
+import csv
+import sys
 import json
+import math
+import pickle
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+try:
+    import orjson  # Serializador en C, mucho más rápido que json
+except ImportError:
+    orjson = None
+
+# Separa los nombres en el texto de búsqueda; no aparece en nombres escritos por teclado
+SEPARADOR = '\x1f'
 
 class Producto:
     """Clase que representa un producto en el inventario"""
+    __slots__ = ('id', 'nombre', 'cantidad', 'precio', '_str')  # Sin __dict__ por instancia
+
     def __init__(self, id_producto, nombre, cantidad, precio):
         self.id = id_producto
         self.nombre = nombre
         self.cantidad = cantidad
         self.precio = precio
+        self._str = None  # Representación en cadena ya formateada (None = por calcular)
     
     def __str__(self):
-        """Representación en cadena del producto"""
-        return f"ID: {self.id} | Nombre: {self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"
+        """Representación en cadena del producto (se formatea una vez y se reutiliza)"""
+        if self._str is None:
+            self._str = f"ID: {self.id} | Nombre: {self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"
+        return self._str
 
     def to_dict(self):
         """Convierte el producto a diccionario para serialización"""
@@ -28,42 +48,160 @@ class Producto:
         return cls(data['id'], data['nombre'], data['cantidad'], data['precio'])
 
 class Inventario:
-    """Clase que gestiona un inventario de productos con persistencia en archivo JSON"""
+    """Clase que gestiona un inventario de productos con persistencia en archivo JSON
+    
+    Si el archivo termina en '.pkl' se usa pickle (protocolo 5) en lugar de
+    JSON: cada producto se guarda como una tupla (id, nombre, cantidad, precio)
+    para no depender de la estructura de la clase Producto. Solo deben
+    cargarse archivos .pkl generados por este mismo programa.
+    
+    Usado como gestor de contexto ('with inventario:') agrupa varios cambios
+    y escribe el archivo una sola vez al salir del bloque.
+    
+    Las búsquedas por nombre se recuerdan en una caché LRU de cache_size
+    entradas (0 la desactiva), que se vacía al agregar o eliminar productos.
     
-    def __init__(self, archivo='inventario.json'):
+    Por defecto el archivo no se fuerza al disco con os.fsync; con
+    durable=True cada guardado espera a que los datos estén en disco.
+    """
+    
+    def __init__(self, archivo='inventario.json', cache_size=128, durable=False):
         self.archivo = archivo
+        self.durable = durable
+        self._usa_pickle = os.path.splitext(archivo)[1] == '.pkl'
         self.productos = {}
+        self._nombres_norm = {}  # Nombres normalizados con casefold() por id
+        self._blob = None  # Nombres normalizados unidos en un solo texto (None = por construir)
+        self._blob_inicios = []
+        self._blob_ids = []
+        self.cache_size = cache_size
+        self._buscar_cacheado = lru_cache(maxsize=cache_size)(self._buscar_por_nombre)
+        self._listado = None  # Texto del listado completo, reutilizado mientras no haya cambios
+        self._nivel_lote = 0  # Bloques 'with' abiertos; mientras sea > 0 no se guarda
+        self._pendiente = False
+        self._respaldo = None  # Estado de los productos al iniciar el lote más externo
         self.cargar_inventario()
 
+    def __len__(self):
+        """Cantidad de productos en el inventario"""
+        return len(self.productos)
+
+    def __enter__(self):
+        """Inicia un lote de cambios: el guardado se difiere hasta salir del bloque"""
+        if self._nivel_lote == 0:
+            self._respaldo = {k: (p, p.cantidad, p.precio) for k, p in self.productos.items()}
+        self._nivel_lote += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Cierra el lote y guarda una sola vez los cambios acumulados
+
+        Si el bloque terminó con una excepción o el guardado falla, los productos
+        vuelven al estado que tenían al iniciar el lote.
+        """
+        self._nivel_lote -= 1
+        if self._nivel_lote == 0:
+            respaldo, self._respaldo = self._respaldo, None
+            if exc_type is not None:
+                self._deshacer_lote(respaldo)
+            else:
+                try:
+                    self.guardar_pendientes()
+                except Exception:
+                    self._deshacer_lote(respaldo)
+                    raise
+        return False
+
+    def _deshacer_lote(self, respaldo):
+        """Restaura los productos, cantidades y precios guardados al iniciar el lote"""
+        for producto, cantidad, precio in respaldo.values():
+            producto.cantidad = cantidad
+            producto.precio = precio
+            producto._str = None
+        self.productos = {k: producto for k, (producto, _, _) in respaldo.items()}
+        self._nombres_norm = {k: p.nombre.casefold() for k, p in self.productos.items()}
+        self._invalidar_caches()
+        self._pendiente = False
+
     def cargar_inventario(self):
         """Carga el inventario desde el archivo con manejo robusto de excepciones"""
         try:
             if os.path.exists(self.archivo):
-                with open(self.archivo, 'r') as file:
-                    data = json.load(file)
-                    self.productos = {k: Producto.from_dict(v) for k, v in data.items()}
+                with open(self.archivo, 'rb') as file:
+                    raw = file.read()
+                if self._usa_pickle:
+                    self.productos = {k: Producto(*v) for k, v in pickle.loads(raw).items()}
+                else:
+                    data = self._decodificar_json(raw)
+                    # Construcción directa, sin pasar por from_dict para cada producto
+                    self.productos = {k: Producto(v['id'], v['nombre'], v['cantidad'], v['precio'])
+                                      for k, v in data.items()}
         except FileNotFoundError:
             print(f"\nℹ️ Archivo {self.archivo} no encontrado. Se iniciará con inventario vacío.")
         except PermissionError as e:
             print(f"\n❌ Error de permisos: No se puede leer {self.archivo}. Detalle: {str(e)}")
             raise
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, pickle.UnpicklingError, EOFError):
             print(f"\n⚠️ El archivo {self.archivo} está corrupto. Se iniciará con inventario vacío.")
         except Exception as e:
             print(f"\n⚠️ Error inesperado al cargar inventario: {str(e)}")
             self.productos = {}
+        self._nombres_norm = {k: p.nombre.casefold() for k, p in self.productos.items()}
+        self._invalidar_caches()
+
+    @staticmethod
+    def _decodificar_json(raw):
+        """Decodifica el JSON con orjson si está disponible, o con json
+
+        orjson no acepta los valores Infinity/NaN que escribe json; en ese caso
+        se reintenta con json antes de considerar el archivo corrupto.
+        """
+        if orjson is not None:
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass
+            else:
+                # orjson lee como float los enteros de más de 64 bits; si alguna cantidad
+                # no quedó entera se vuelve a leer con json, que los conserva exactos
+                if not isinstance(data, dict) or all(
+                        not isinstance(v, dict) or isinstance(v.get('cantidad'), int)
+                        for v in data.values()):
+                    return data
+        return json.loads(raw)
+
+    def _invalidar_caches(self):
+        """Descarta las búsquedas y el listado guardados tras un cambio en los productos"""
+        self._buscar_cacheado.cache_clear()
+        self._listado = None
+        self._blob = None
 
     def guardar_inventario(self):
         """Guarda el inventario en el archivo con manejo atómico de errores"""
         temp_file = self.archivo + '.tmp'
         try:
-            with open(temp_file, 'w') as file:
-                json.dump({k: v.to_dict() for k, v in self.productos.items()}, file, indent=4)
+            if self._usa_pickle:
+                data = {k: (v.id, v.nombre, v.cantidad, v.precio) for k, v in self.productos.items()}
+                contenido = pickle.dumps(data, protocol=5)
+            else:
+                data = {k: v.to_dict() for k, v in self.productos.items()}
+                contenido = None
+                # orjson escribe inf/nan como null, así que esos casos quedan para json
+                if orjson is not None and self._precios_finitos():
+                    try:
+                        contenido = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+                    except orjson.JSONEncodeError:
+                        pass  # Enteros de más de 64 bits: json sí los admite
+                if contenido is None:
+                    contenido = json.dumps(data, indent=4).encode()
+            with open(temp_file, 'wb') as file:
+                file.write(contenido)
+                if self.durable:
+                    file.flush()
+                    os.fsync(file.fileno())
             
-            # Reemplazo atómico del archivo
-            if os.path.exists(self.archivo):
-                os.remove(self.archivo)
-            os.rename(temp_file, self.archivo)
+            # Reemplazo atómico del archivo (os.replace sobrescribe el destino si existe)
+            os.replace(temp_file, self.archivo)
             
         except PermissionError as e:
             print(f"\n❌ Error de permisos al guardar inventario: {str(e)}")
@@ -81,6 +219,23 @@ class Inventario:
                 os.remove(temp_file)
             raise
 
+    def _precios_finitos(self):
+        """Indica si ningún precio es inf o nan"""
+        return all(not isinstance(p.precio, float) or math.isfinite(p.precio)
+                   for p in self.productos.values())
+
+    def guardar_pendientes(self):
+        """Guarda el archivo solo si hay cambios sin escribir"""
+        if self._pendiente:
+            self.guardar_inventario()
+            self._pendiente = False
+
+    def _persistir(self):
+        """Guarda los cambios, o los marca como pendientes si hay un lote abierto"""
+        self._pendiente = True
+        if self._nivel_lote == 0:
+            self.guardar_pendientes()
+
     # Resto de métodos del inventario...
     def agregar_producto(self, producto):
         try:
@@ -88,19 +243,71 @@ class Inventario:
                 print(f"\n⚠️ Producto con ID {producto.id} ya existe")
                 return False
             self.productos[producto.id] = producto
-            self.guardar_inventario()
+            self._nombres_norm[producto.id] = producto.nombre.casefold()
+            self._invalidar_caches()
+            try:
+                self._persistir()
+            except Exception:
+                # No dejar en memoria un cambio que no se pudo guardar
+                del self.productos[producto.id]
+                del self._nombres_norm[producto.id]
+                self._invalidar_caches()
+                raise
             return True
         except Exception as e:
             print(f"\n❌ Error al agregar producto: {str(e)}")
             return False
 
+    def agregar_productos(self, productos):
+        """Agrega varios productos escribiendo el archivo una sola vez; retorna cuántos se agregaron"""
+        try:
+            with self:
+                return sum(1 for producto in productos if self.agregar_producto(producto))
+        except Exception as e:
+            print(f"\n❌ Error al agregar productos: {str(e)}")
+            return 0
+
+    def cargar_desde_csv(self, ruta):
+        """Importa productos desde un archivo con líneas 'id|nombre|cantidad|precio'
+
+        Todos los productos se agregan en un solo lote, con una única escritura.
+        Retorna una tupla (agregados, lineas_invalidas); las líneas vacías se ignoran.
+        """
+        productos = []
+        invalidas = 0
+        with open(ruta, 'r', newline='') as file:
+            for fila in csv.reader(file, delimiter='|', quoting=csv.QUOTE_NONE):
+                if not any(campo.strip() for campo in fila):
+                    continue
+                try:
+                    id_producto, nombre, cantidad, precio = fila
+                    producto = Producto(id_producto.strip(), nombre.strip(), int(cantidad), float(precio))
+                except ValueError:
+                    invalidas += 1
+                    continue
+                # 'not (... >= 0)' rechaza también nan, igual que la validación interactiva
+                if not producto.id or producto.cantidad < 0 or not (producto.precio >= 0):
+                    invalidas += 1
+                    continue
+                productos.append(producto)
+        return self.agregar_productos(productos), invalidas
+
     def eliminar_producto(self, id_producto):
         try:
             if id_producto not in self.productos:
                 print(f"\n⚠️ Producto con ID {id_producto} no encontrado")
                 return False
-            del self.productos[id_producto]
-            self.guardar_inventario()
+            producto = self.productos.pop(id_producto)
+            nombre_norm = self._nombres_norm.pop(id_producto)
+            self._invalidar_caches()
+            try:
+                self._persistir()
+            except Exception:
+                # No dejar en memoria un cambio que no se pudo guardar
+                self.productos[id_producto] = producto
+                self._nombres_norm[id_producto] = nombre_norm
+                self._invalidar_caches()
+                raise
             return True
         except Exception as e:
             print(f"\n❌ Error al eliminar producto: {str(e)}")
@@ -113,12 +320,28 @@ class Inventario:
                 return False
             
             producto = self.productos[id_producto]
-            if cantidad is not None:
+            # Si los valores no cambian no hay nada que escribir
+            cambia_cantidad = cantidad is not None and cantidad != producto.cantidad
+            cambia_precio = precio is not None and precio != producto.precio
+            if not (cambia_cantidad or cambia_precio):
+                return True
+
+            anteriores = (producto.cantidad, producto.precio)
+            if cambia_cantidad:
                 producto.cantidad = cantidad
-            if precio is not None:
+            if cambia_precio:
                 producto.precio = precio
+            producto._str = None
+            self._listado = None
             
-            self.guardar_inventario()
+            try:
+                self._persistir()
+            except Exception:
+                # No dejar en memoria un cambio que no se pudo guardar
+                producto.cantidad, producto.precio = anteriores
+                producto._str = None
+                self._listado = None
+                raise
             return True
         except Exception as e:
             print(f"\n❌ Error al actualizar producto: {str(e)}")
@@ -128,11 +351,49 @@ class Inventario:
         return self.productos.get(id_producto)
 
     def buscar_por_nombre(self, nombre_buscado):
-        nombre_buscado = nombre_buscado.lower()
-        return [p for p in self.productos.values() if nombre_buscado in p.nombre.lower()]
+        return list(self._buscar_cacheado(nombre_buscado.casefold()))
+
+    def _buscar_por_nombre(self, nombre_buscado):
+        """Búsqueda sin caché sobre el texto con todos los nombres
+
+        Retorna una tupla para que el resultado cacheado no se modifique.
+        """
+        if not nombre_buscado:
+            return tuple(self.productos.values())
+        if SEPARADOR in nombre_buscado:
+            return ()
+        if self._blob is None:
+            self._construir_blob()
+        # str.find recorre el texto en C; cada coincidencia se ubica en su nombre con bisect
+        resultados = []
+        pos = self._blob.find(nombre_buscado)
+        while pos != -1:
+            i = bisect_right(self._blob_inicios, pos) - 1
+            resultados.append(self.productos[self._blob_ids[i]])
+            pos = self._blob.find(nombre_buscado, self._blob_inicios[i + 1])  # Siguiente nombre
+        return tuple(resultados)
+
+    def _construir_blob(self):
+        """Une los nombres normalizados en un solo texto separado por SEPARADOR"""
+        nombres = self._nombres_norm.values()
+        self._blob_ids = list(self._nombres_norm)
+        self._blob = SEPARADOR.join(nombres) + SEPARADOR
+        # Posición donde empieza cada nombre; la última entrada es el largo total del texto
+        self._blob_inicios = list(accumulate((len(nombre) + 1 for nombre in nombres), initial=0))
 
     def obtener_todos(self):
-        return list(self.productos.values())
+        """Vista sin copiar de los productos; usar list() si se necesita una copia fija"""
+        return self.productos.values()
+
+    def listado(self):
+        """Obtiene el texto con todos los productos, una línea por producto"""
+        if self._listado is None:
+            self._listado = '\n'.join(str(p) for p in self.productos.values())
+        return self._listado
+
+    def valor_total(self):
+        """Calcula el valor del inventario (suma de cantidad * precio)"""
+        return sum(p.cantidad * p.precio for p in self.productos.values())
 
 def mostrar_menu():
     """Muestra el menú principal"""
@@ -144,6 +405,7 @@ def mostrar_menu():
     print("5. Buscar por nombre")
     print("6. Mostrar todos los productos")
     print("7. Salir")
+    print("8. Importar productos desde archivo")
 
 
 def solicitar_datos_producto():
@@ -188,7 +450,7 @@ def main():
     
     while True:
         mostrar_menu()
-        opcion = input("\nSeleccione una opción (1-7): ")
+        opcion = input("\nSeleccione una opción (1-8): ")
         
         if opcion == '1':
             producto = solicitar_datos_producto()
@@ -244,19 +506,21 @@ def main():
             
             if resultados:
                 print(f"\nSe encontraron {len(resultados)} productos:")
-                for producto in resultados:
-                    print(producto)
+                sys.stdout.write('\n'.join(map(str, resultados)))
+                sys.stdout.write('\n')
             else:
                 print("\n✗ No se encontraron productos con ese nombre")
         
         elif opcion == '6':
-            productos = inventario.obtener_todos()
+            total = len(inventario)
             
-            if productos:
+            if total:
                 print("\n--- LISTADO DE PRODUCTOS ---")
-                for producto in productos:
-                    print(producto)
-                print(f"\nTotal: {len(productos)} productos")
+                # Una sola escritura para todo el listado en lugar de un print por producto
+                sys.stdout.write(inventario.listado())
+                sys.stdout.write('\n')
+                print(f"\nTotal: {total} productos")
+                print(f"Valor del inventario: ${inventario.valor_total():.2f}")
             else:
                 print("\nEl inventario está vacío")
         
@@ -264,8 +528,18 @@ def main():
             print("\nSaliendo del sistema...")
             break
         
+        elif opcion == '8':
+            ruta = input("\nIngrese la ruta del archivo a importar (id|nombre|cantidad|precio): ").strip()
+            try:
+                agregados, invalidas = inventario.cargar_desde_csv(ruta)
+                print(f"\n✓ Se importaron {agregados} productos")
+                if invalidas:
+                    print(f"⚠️ Se omitieron {invalidas} líneas con formato inválido")
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                print(f"\n✗ Error al leer el archivo: {e}")
+        
         else:
-            print("\n✗ Opción no válida. Por favor seleccione una opción del 1 al 7.")
+            print("\n✗ Opción no válida. Por favor seleccione una opción del 1 al 8.")
         
         input("\nPresione Enter para continuar...")
 
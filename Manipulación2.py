@@ -0,0 +1,373 @@
+import csv
+import sys
+import sqlite3
+
+class Producto:
+    """Clase que representa un producto en el inventario"""
+    __slots__ = ('id', 'nombre', 'cantidad', 'precio', '_str')  # Sin __dict__ por instancia
+
+    def __init__(self, id_producto, nombre, cantidad, precio):
+        self.id = id_producto
+        self.nombre = nombre
+        self.cantidad = cantidad
+        self.precio = precio
+        self._str = None  # Representación en cadena ya formateada (None = por calcular)
+    
+    def __str__(self):
+        """Representación en cadena del producto (se formatea una vez y se reutiliza)"""
+        if self._str is None:
+            self._str = f"ID: {self.id} | Nombre: {self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"
+        return self._str
+
+class Inventario:
+    """Clase que gestiona un inventario de productos con persistencia en una base SQLite
+    
+    Cada cambio modifica solo la fila afectada (indexada por la clave primaria)
+    en lugar de reescribir todo el archivo. Usado como gestor de contexto
+    ('with inventario:') agrupa varios cambios en una sola transacción.
+    
+    Con durable=True se usa synchronous=FULL: cada confirmación espera a que
+    los datos estén en disco. Por defecto basta con NORMAL, que en modo WAL
+    no corrompe la base ante una caída pero puede perder la última transacción.
+    """
+
+    # SQLite reutiliza las sentencias ya preparadas mientras el texto sea el mismo
+    _SQL_CREAR = """
+        CREATE TABLE IF NOT EXISTS productos (
+            id TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            cantidad INTEGER NOT NULL,
+            precio REAL NOT NULL
+        )
+    """
+    _SQL_INSERTAR = "INSERT INTO productos (id, nombre, cantidad, precio) VALUES (?, ?, ?, ?)"
+    _SQL_INSERTAR_LOTE = "INSERT OR IGNORE INTO productos (id, nombre, cantidad, precio) VALUES (?, ?, ?, ?)"
+    _SQL_ELIMINAR = "DELETE FROM productos WHERE id = ?"
+    # Solo toca la fila si algún valor cambia; así una actualización sin cambios no escribe nada
+    _SQL_ACTUALIZAR = ("UPDATE productos SET cantidad = COALESCE(:cantidad, cantidad), "
+                       "precio = COALESCE(:precio, precio) "
+                       "WHERE id = :id AND (cantidad IS NOT COALESCE(:cantidad, cantidad) "
+                       "OR precio IS NOT COALESCE(:precio, precio))")
+    _SQL_POR_ID = "SELECT id, nombre, cantidad, precio FROM productos WHERE id = ?"
+    _SQL_POR_NOMBRE = ("SELECT id, nombre, cantidad, precio FROM productos "
+                       "WHERE instr(normalizar(nombre), ?) > 0 ORDER BY rowid")
+    _SQL_TODOS = "SELECT id, nombre, cantidad, precio FROM productos ORDER BY rowid"
+    _SQL_CONTAR = "SELECT COUNT(*) FROM productos"
+    _SQL_VALOR_TOTAL = "SELECT COALESCE(SUM(cantidad * precio), 0) FROM productos"
+
+    def __init__(self, archivo='inventario.db', durable=False):
+        self.archivo = archivo
+        self.durable = durable
+        self._nivel_lote = 0  # Bloques 'with' abiertos; mientras sea > 0 no se confirma
+        self._listado = None  # Texto del listado completo, reutilizado mientras no haya cambios
+        try:
+            self.conexion = sqlite3.connect(archivo)
+            # lower() de SQLite solo convierte ASCII; se usa casefold() de Python, igual que en
+            # las otras versiones, para nombres con tildes o ñ
+            self.conexion.create_function('normalizar', 1, str.casefold, deterministic=True)
+            self.conexion.execute("PRAGMA journal_mode = WAL")
+            self.conexion.execute("PRAGMA synchronous = FULL" if durable else "PRAGMA synchronous = NORMAL")
+            self.conexion.execute("PRAGMA cache_size = -65536")  # 64 MiB de caché de páginas
+            self.conexion.execute(self._SQL_CREAR)
+            self.conexion.commit()
+        except sqlite3.Error as e:
+            print(f"\n❌ Error al abrir la base de datos {archivo}: {str(e)}")
+            raise
+
+    def __len__(self):
+        """Cantidad de productos en el inventario, contada por SQLite"""
+        return self.conexion.execute(self._SQL_CONTAR).fetchone()[0]
+
+    def __enter__(self):
+        """Inicia un lote de cambios: la confirmación se difiere hasta salir del bloque"""
+        self._nivel_lote += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Cierra el lote: confirma los cambios acumulados, o los descarta si hubo una excepción"""
+        self._nivel_lote -= 1
+        if self._nivel_lote == 0:
+            if exc_type is not None:
+                self.conexion.rollback()
+                self._listado = None
+            else:
+                self.guardar_pendientes()
+        return False
+
+    def guardar_pendientes(self):
+        """Confirma la transacción abierta, si la hay"""
+        try:
+            self.conexion.commit()
+        except sqlite3.Error as e:
+            print(f"\n❌ Error al guardar inventario: {str(e)}")
+            raise
+
+    def _persistir(self):
+        """Confirma los cambios, salvo que haya un lote abierto"""
+        self._listado = None
+        if self._nivel_lote == 0:
+            self.guardar_pendientes()
+
+    def cerrar(self):
+        """Confirma los cambios pendientes y cierra la conexión"""
+        self.guardar_pendientes()
+        self.conexion.close()
+
+    def agregar_producto(self, producto):
+        try:
+            self.conexion.execute(self._SQL_INSERTAR,
+                                  (producto.id, producto.nombre, producto.cantidad, producto.precio))
+            self._persistir()
+            return True
+        except sqlite3.IntegrityError:
+            print(f"\n⚠️ Producto con ID {producto.id} ya existe")
+            self._persistir()  # Cierra la transacción implícita que abrió el INSERT
+            return False
+        except Exception as e:
+            print(f"\n❌ Error al agregar producto: {str(e)}")
+            return False
+
+    def agregar_productos(self, productos):
+        """Agrega varios productos en una sola transacción; retorna cuántos se agregaron
+
+        Los productos cuyo ID ya existe se omiten.
+        """
+        try:
+            with self:
+                antes = self.conexion.total_changes
+                self.conexion.executemany(self._SQL_INSERTAR_LOTE,
+                                          ((p.id, p.nombre, p.cantidad, p.precio) for p in productos))
+                self._listado = None
+                return self.conexion.total_changes - antes
+        except Exception as e:
+            print(f"\n❌ Error al agregar productos: {str(e)}")
+            return 0
+
+    def cargar_desde_csv(self, ruta):
+        """Importa productos desde un archivo con líneas 'id|nombre|cantidad|precio'
+
+        Todos los productos se agregan en un solo lote, con una única escritura.
+        Retorna una tupla (agregados, lineas_invalidas); las líneas vacías se ignoran.
+        """
+        productos = []
+        invalidas = 0
+        with open(ruta, 'r', newline='') as file:
+            for fila in csv.reader(file, delimiter='|', quoting=csv.QUOTE_NONE):
+                if not any(campo.strip() for campo in fila):
+                    continue
+                try:
+                    id_producto, nombre, cantidad, precio = fila
+                    producto = Producto(id_producto.strip(), nombre.strip(), int(cantidad), float(precio))
+                except ValueError:
+                    invalidas += 1
+                    continue
+                # 'not (... >= 0)' rechaza también nan, igual que la validación interactiva;
+                # las cantidades que no caben en un INTEGER de SQLite (64 bits) también son inválidas
+                if (not producto.id or not 0 <= producto.cantidad <= 2**63 - 1
+                        or not (producto.precio >= 0)):
+                    invalidas += 1
+                    continue
+                productos.append(producto)
+        return self.agregar_productos(productos), invalidas
+
+    def eliminar_producto(self, id_producto):
+        try:
+            if self.conexion.execute(self._SQL_ELIMINAR, (id_producto,)).rowcount == 0:
+                print(f"\n⚠️ Producto con ID {id_producto} no encontrado")
+                self._persistir()  # Cierra la transacción implícita que abrió el DELETE
+                return False
+            self._persistir()
+            return True
+        except Exception as e:
+            print(f"\n❌ Error al eliminar producto: {str(e)}")
+            return False
+
+    def actualizar_producto(self, id_producto, cantidad=None, precio=None):
+        try:
+            parametros = {'id': id_producto, 'cantidad': cantidad, 'precio': precio}
+            if self.conexion.execute(self._SQL_ACTUALIZAR, parametros).rowcount == 0:
+                # Ninguna fila cambió: o el producto no existe o los valores ya eran esos.
+                # En ambos casos se cierra la transacción implícita que abrió el UPDATE
+                existe = self.conexion.execute(self._SQL_POR_ID, (id_producto,)).fetchone() is not None
+                self._persistir()
+                if not existe:
+                    print(f"\n⚠️ Producto con ID {id_producto} no encontrado")
+                return existe
+            self._persistir()
+            return True
+        except Exception as e:
+            print(f"\n❌ Error al actualizar producto: {str(e)}")
+            return False
+
+    def buscar_por_id(self, id_producto):
+        fila = self.conexion.execute(self._SQL_POR_ID, (id_producto,)).fetchone()
+        return Producto(*fila) if fila else None
+
+    def buscar_por_nombre(self, nombre_buscado):
+        filas = self.conexion.execute(self._SQL_POR_NOMBRE, (nombre_buscado.casefold(),))
+        return [Producto(*fila) for fila in filas]
+
+    def obtener_todos(self):
+        return [Producto(*fila) for fila in self.conexion.execute(self._SQL_TODOS)]
+
+    def listado(self):
+        """Obtiene el texto con todos los productos; se consulta la base solo si hubo cambios"""
+        if self._listado is None:
+            self._listado = '\n'.join(str(p) for p in self.obtener_todos())
+        return self._listado
+
+    def valor_total(self):
+        """Calcula el valor del inventario; la suma la resuelve SQLite sin crear objetos Producto"""
+        return self.conexion.execute(self._SQL_VALOR_TOTAL).fetchone()[0]
+
+def mostrar_menu():
+    """Muestra el menú principal"""
+    print("\n--- SISTEMA DE GESTIÓN DE INVENTARIO ---")
+    print("1. Agregar producto")
+    print("2. Eliminar producto")
+    print("3. Actualizar producto")
+    print("4. Buscar por ID")
+    print("5. Buscar por nombre")
+    print("6. Mostrar todos los productos")
+    print("7. Salir")
+    print("8. Importar productos desde archivo")
+
+
+def solicitar_datos_producto():
+    """Solicita los datos para un nuevo producto"""
+    print("\n--- INGRESO DE NUEVO PRODUCTO ---")
+    
+    # Validar ID
+    while True:
+        id_producto = input("ID del producto: ").strip()
+        if id_producto:
+            break
+        print("Error: El ID no puede estar vacío")
+    
+    nombre = input("Nombre del producto: ").strip()
+    
+    # Validar cantidad
+    while True:
+        try:
+            cantidad = int(input("Cantidad en inventario: "))
+            if cantidad >= 0:
+                break
+            print("Error: La cantidad debe ser 0 o mayor")
+        except ValueError:
+            print("Error: Debe ingresar un número entero")
+    
+    # Validar precio
+    while True:
+        try:
+            precio = float(input("Precio unitario: "))
+            if precio >= 0:
+                break
+            print("Error: El precio debe ser 0 o mayor")
+        except ValueError:
+            print("Error: Debe ingresar un número válido")
+    
+    return Producto(id_producto, nombre, cantidad, precio)
+
+
+def main():
+    """Función principal del programa"""
+    inventario = Inventario()
+    
+    while True:
+        mostrar_menu()
+        opcion = input("\nSeleccione una opción (1-8): ")
+        
+        if opcion == '1':
+            producto = solicitar_datos_producto()
+            if inventario.agregar_producto(producto):
+                print("\n✓ Producto agregado correctamente")
+            else:
+                print("\n✗ Error: Ya existe un producto con ese ID")
+        
+        elif opcion == '2':
+            id_producto = input("\nIngrese el ID del producto a eliminar: ")
+            if inventario.eliminar_producto(id_producto):
+                print("\n✓ Producto eliminado correctamente")
+            else:
+                print("\n✗ Error: No se encontró el producto")
+        
+        elif opcion == '3':
+            id_producto = input("\nIngrese el ID del producto a actualizar: ")
+            producto = inventario.buscar_por_id(id_producto)
+            
+            if producto:
+                print(f"\nProducto actual:\n{producto}")
+                
+                # Obtener nuevos valores (mantener los antiguos si no se ingresan nuevos)
+                try:
+                    nueva_cantidad = input("Nueva cantidad (deje vacío para mantener): ")
+                    cantidad = int(nueva_cantidad) if nueva_cantidad else None
+                    
+                    nuevo_precio = input("Nuevo precio (deje vacío para mantener): ")
+                    precio = float(nuevo_precio) if nuevo_precio else None
+                    
+                    if inventario.actualizar_producto(id_producto, cantidad, precio):
+                        print("\n✓ Producto actualizado correctamente")
+                    else:
+                        print("\n✗ Error al actualizar el producto")
+                except ValueError:
+                    print("\n✗ Error: Ingrese valores numéricos válidos")
+            else:
+                print("\n✗ Error: Producto no encontrado")
+        
+        elif opcion == '4':
+            id_producto = input("\nIngrese el ID del producto a buscar: ")
+            producto = inventario.buscar_por_id(id_producto)
+            
+            if producto:
+                print("\nProducto encontrado:")
+                print(producto)
+            else:
+                print("\n✗ Producto no encontrado")
+        
+        elif opcion == '5':
+            nombre = input("\nIngrese el nombre o parte del nombre a buscar: ")
+            resultados = inventario.buscar_por_nombre(nombre)
+            
+            if resultados:
+                print(f"\nSe encontraron {len(resultados)} productos:")
+                sys.stdout.write('\n'.join(map(str, resultados)))
+                sys.stdout.write('\n')
+            else:
+                print("\n✗ No se encontraron productos con ese nombre")
+        
+        elif opcion == '6':
+            total = len(inventario)
+            
+            if total:
+                print("\n--- LISTADO DE PRODUCTOS ---")
+                # Una sola escritura para todo el listado en lugar de un print por producto
+                sys.stdout.write(inventario.listado())
+                sys.stdout.write('\n')
+                print(f"\nTotal: {total} productos")
+                print(f"Valor del inventario: ${inventario.valor_total():.2f}")
+            else:
+                print("\nEl inventario está vacío")
+        
+        elif opcion == '7':
+            inventario.cerrar()
+            print("\nSaliendo del sistema...")
+            break
+        
+        elif opcion == '8':
+            ruta = input("\nIngrese la ruta del archivo a importar (id|nombre|cantidad|precio): ").strip()
+            try:
+                agregados, invalidas = inventario.cargar_desde_csv(ruta)
+                print(f"\n✓ Se importaron {agregados} productos")
+                if invalidas:
+                    print(f"⚠️ Se omitieron {invalidas} líneas con formato inválido")
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                print(f"\n✗ Error al leer el archivo: {e}")
+        
+        else:
+            print("\n✗ Opción no válida. Por favor seleccione una opción del 1 al 8.")
+        
+        input("\nPresione Enter para continuar...")
+
+if __name__ == "__main__":
+    main()